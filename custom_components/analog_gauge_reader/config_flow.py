@@ -15,6 +15,20 @@ from .const import (
     CONF_ALARM_3,
 )
 
+STEP_USER_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_SNAPSHOT_URL): str,
+        vol.Required(CONF_INTERVAL, default=15): vol.All(
+            vol.Coerce(int), vol.In([1, 15])
+        ),
+        vol.Required(CONF_MIN_READING, default=0.0): vol.Coerce(float),
+        vol.Required(CONF_MAX_READING, default=3.0): vol.Coerce(float),
+        vol.Optional(CONF_ALARM_1): vol.Coerce(float),
+        vol.Optional(CONF_ALARM_2): vol.Coerce(float),
+        vol.Optional(CONF_ALARM_3): vol.Coerce(float),
+    }
+)
+
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Analog Gauge Reader."""
@@ -35,20 +49,6 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     data=user_input
                 )
 
-        schema = vol.Schema(
-            {
-                vol.Required(CONF_SNAPSHOT_URL): str,
-                vol.Required(CONF_INTERVAL, default=15): vol.All(
-                    vol.Coerce(int), vol.In([1, 15])
-                ),
-                vol.Required(CONF_MIN_READING, default=0.0): vol.Coerce(float),
-                vol.Required(CONF_MAX_READING, default=3.0): vol.Coerce(float),
-                vol.Optional(CONF_ALARM_1): vol.Coerce(float),
-                vol.Optional(CONF_ALARM_2): vol.Coerce(float),
-                vol.Optional(CONF_ALARM_3): vol.Coerce(float),
-            }
-        )
-
         return self.async_show_form(
-            step_id="user", data_schema=schema, errors=errors
+            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
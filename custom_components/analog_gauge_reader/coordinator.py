@@ -2,12 +2,16 @@
 from __future__ import annotations
 
 from datetime import timedelta
+import hashlib
 import logging
 import urllib.request
 import ssl
 
+import aiohttp
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
@@ -24,6 +28,11 @@ from .image_processing import process_gauge_image
 
 _LOGGER = logging.getLogger(__name__)
 
+REQUEST_HEADERS = {
+    'User-Agent': 'HomeAssistant/GaugeReader',
+    'Accept': 'image/*,*/*',
+}
+
 
 def fetch_image_sync(url: str, timeout: int = 30) -> bytes:
     """Fetch image using urllib (more lenient with headers)."""
@@ -32,13 +41,7 @@ def fetch_image_sync(url: str, timeout: int = 30) -> bytes:
     ctx.check_hostname = False
     ctx.verify_mode = ssl.CERT_NONE
     
-    req = urllib.request.Request(
-        url,
-        headers={
-            'User-Agent': 'HomeAssistant/GaugeReader',
-            'Accept': 'image/*,*/*',
-        }
-    )
+    req = urllib.request.Request(url, headers=REQUEST_HEADERS)
     
     with urllib.request.urlopen(req, timeout=timeout, context=ctx) as response:
         return response.read()
@@ -50,6 +53,17 @@ class GaugeCoordinator(DataUpdateCoordinator):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         """Initialize."""
         self.entry = entry
+        # Entry data is fixed for the lifetime of the config entry
+        self._snapshot_url = entry.data[CONF_SNAPSHOT_URL]
+        self._min_reading = entry.data[CONF_MIN_READING]
+        self._max_reading = entry.data[CONF_MAX_READING]
+        # Shared HA session: keeps connections (and TLS sessions) alive between updates
+        self._session = async_get_clientsession(hass, verify_ssl=False)
+        # Threshold direction the needle was last found with (stable for a camera)
+        self._last_direction: str | None = None
+        # Digest and reading of the last processed snapshot (skip unchanged frames)
+        self._last_image_hash: bytes | None = None
+        self._last_value: float | None = None
         interval_minutes = entry.data.get(CONF_INTERVAL, 15)
         update_interval = timedelta(minutes=int(interval_minutes))
 
@@ -60,21 +74,29 @@ class GaugeCoordinator(DataUpdateCoordinator):
             update_interval=update_interval,
         )
 
+    async def _async_fetch_image(self, url: str, timeout: int = 30) -> bytes:
+        """Fetch image bytes over the shared aiohttp session."""
+        try:
+            response = await self._session.get(
+                url,
+                headers=REQUEST_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            )
+        except aiohttp.ClientResponseError as err:
+            # Some cameras send headers aiohttp rejects; urllib is more lenient
+            _LOGGER.debug("aiohttp could not parse the response (%s), retrying with urllib", err)
+            return await self.hass.async_add_executor_job(fetch_image_sync, url, timeout)
+
+        async with response:
+            response.raise_for_status()
+            return await response.read()
+
     async def _async_update_data(self):
         """Fetch data from camera snapshot URL and process it."""
-        snapshot_url = self.entry.data[CONF_SNAPSHOT_URL]
-        min_reading = self.entry.data[CONF_MIN_READING]
-        max_reading = self.entry.data[CONF_MAX_READING]
-
-        _LOGGER.info("Fetching gauge image from: %s", snapshot_url)
+        _LOGGER.info("Fetching gauge image from: %s", self._snapshot_url)
 
         try:
-            # Run synchronous fetch in executor (urllib is more lenient with headers)
-            image_bytes = await self.hass.async_add_executor_job(
-                fetch_image_sync,
-                snapshot_url,
-                30
-            )
+            image_bytes = await self._async_fetch_image(self._snapshot_url)
             
             if len(image_bytes) < 1000:
                 raise UpdateFailed("Image too small, camera may be offline")
@@ -85,19 +107,30 @@ class GaugeCoordinator(DataUpdateCoordinator):
             _LOGGER.error("Error fetching image: %s", err)
             raise UpdateFailed(f"Error fetching image: {err}")
 
+        # A static camera often returns the very same JPEG: reuse the last reading
+        image_hash = hashlib.blake2b(image_bytes, digest_size=16).digest()
+        if image_hash == self._last_image_hash:
+            _LOGGER.debug("Snapshot unchanged, reusing last reading")
+            return self._last_value
+
         # Process image
         try:
-            value = await self.hass.async_add_executor_job(
+            value, direction = await self.hass.async_add_executor_job(
                 process_gauge_image,
                 image_bytes,
-                min_reading,
-                max_reading
+                self._min_reading,
+                self._max_reading,
+                self._last_direction,
             )
             
+            self._last_image_hash = image_hash
+            self._last_value = value
+            
             if value is None:
                 _LOGGER.warning("Could not detect gauge reading from image")
                 return None
                 
+            self._last_direction = direction
             _LOGGER.info("Gauge reading: %.2f", value)
             return value
             
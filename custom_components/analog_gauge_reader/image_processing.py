@@ -1,142 +1,152 @@
 """Image processing for Analog Gauge Reader - Improved Algorithm."""
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from io import BytesIO
 import logging
 import math
 
 _LOGGER = logging.getLogger(__name__)
 
+try:
+    import cv2
+except ImportError as err:  # Reported when an image is processed
+    cv2 = None
+    _CV2_IMPORT_ERROR = err
 
-def process_gauge_image(image_bytes: bytes, min_val: float, max_val: float) -> float | None:
+# Needle angle only needs ~1-2 degrees of precision, so larger snapshots
+# are scaled down to this maximum side length before detection
+_MAX_IMAGE_SIDE = 512
+
+# A needle at least this long (pixels, at working resolution) found with the
+# remembered threshold direction is trusted without trying the other one
+_CONFIDENT_NEEDLE_LENGTH = 100
+
+# Needle candidate filters (area in pixels at working resolution;
+# eccentricity > 0.7 means elongated)
+_MIN_OBJECT_SIZE = 50
+_MIN_REGION_AREA = 100
+_MIN_ECCENTRICITY = 0.7
+
+# Standard gauge parameters
+_GAUGE_START = 225  # 7 o'clock
+_GAUGE_SWEEP = 270  # Total sweep angle
+
+# Evaluates both threshold directions concurrently while the polarity is
+# still unknown (OpenCV releases the GIL, so the two pipelines overlap)
+_DIRECTION_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="analog_gauge_reader")
+
+# Structuring element (radius 3 disk) for closing the thresholded image
+_CLOSE_KERNEL = (
+    cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7)) if cv2 is not None else None
+)
+
+
+def process_gauge_image(
+    image_bytes: bytes,
+    min_val: float,
+    max_val: float,
+    preferred_direction: str | None = None,
+) -> tuple[float | None, str | None]:
     """Process gauge image and return the reading.
     
+    Returns a (reading, direction) tuple, where direction is the threshold
+    direction ('darker' or 'lighter') the needle was found with. Passing it
+    back as preferred_direction on the next call lets detection try that
+    direction first.
+    
     Improved algorithm with multiple detection strategies:
     1. Multiple edge detection parameters
     2. Fallback to center-of-mass for needle detection
     3. Adaptive thresholding
     4. Larger tolerance for varied gauge types
     """
-    try:
-        from skimage import io as skio
-        from skimage import color, filters, morphology, measure
-        from skimage.transform import hough_circle, hough_circle_peaks, hough_line, hough_line_peaks
-        from skimage.feature import canny
-    except ImportError as e:
-        _LOGGER.error("scikit-image not available: %s", e)
-        return None
+    if cv2 is None:
+        _LOGGER.error("OpenCV not available: %s", _CV2_IMPORT_ERROR)
+        return None, None
 
     try:
-        # Load image from bytes
-        image = skio.imread(BytesIO(image_bytes))
-        _LOGGER.debug("Image loaded, shape: %s", image.shape)
+        # Decode straight to 8-bit grayscale (no color conversion pass needed),
+        # letting libjpeg downscale while decoding when the image is large
+        # (the memoryview lets _jpeg_size slice the header without copying)
+        buffer = memoryview(image_bytes)
+        gray8 = cv2.imdecode(np.frombuffer(buffer, np.uint8), _grayscale_decode_flag(buffer))
+        if gray8 is None:
+            _LOGGER.error("Could not decode image (%d bytes)", len(image_bytes))
+            return None, None
+        _LOGGER.debug("Image loaded, shape: %s", gray8.shape)
         
-        # Convert to grayscale if needed
-        if len(image.shape) == 3:
-            # Handle RGBA images (4 channels) - common with PNG files
-            if image.shape[2] == 4:
-                image = image[:, :, :3]  # Remove alpha channel
-            gray = color.rgb2gray(image)
-        else:
-            gray = image.astype(float) / 255.0 if image.max() > 1 else image
+        # Downscale to the working resolution (the reading is scale-invariant)
+        if max(gray8.shape) > _MAX_IMAGE_SIDE:
+            scale = _MAX_IMAGE_SIDE / max(gray8.shape)
+            gray8 = cv2.resize(gray8, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            _LOGGER.debug("Image resized to: %s", gray8.shape)
         
-        height, width = gray.shape
+        height, width = gray8.shape
         _LOGGER.debug("Grayscale image: %dx%d", width, height)
         
         # Use ONLY threshold-based detection (best for selecting longest needle)
-        # Hough method disabled because it cannot reliably distinguish between
-        # multiple needles of different lengths (it detects lines, not segments)
+        # Hough line detection was removed because it cannot reliably distinguish
+        # between multiple needles of different lengths (it detects lines, not segments)
         _LOGGER.debug("Using threshold-based detection...")
-        result = _detect_gauge_threshold(gray, min_val, max_val, height, width)
+        result, direction = _detect_gauge_threshold(
+            gray8, min_val, max_val, height, width, preferred_direction
+        )
         if result is not None:
             _LOGGER.info("Gauge reading: %.2f bar", result)
-            return result
+            return result, direction
         
         _LOGGER.warning("Could not detect gauge reading")
-        return None
+        return None, None
         
     except Exception as e:
         _LOGGER.error("Error processing gauge image: %s", e, exc_info=True)
-        return None
+        return None, None
 
 
-def _detect_gauge(gray, sigma, min_val, max_val, height, width):
-    """Detect gauge using Hough transforms - selects the LONGEST needle line.
+def _grayscale_decode_flag(image_bytes):
+    """Pick the cv2.imdecode grayscale flag for the working resolution.
     
-    This gauge has two needles - we need to select the LONGEST one.
+    libjpeg can scale a JPEG by 1/2, 1/4 or 1/8 while decoding, skipping
+    most of the IDCT work. Use the largest factor that still leaves at
+    least _MAX_IMAGE_SIDE pixels on the longest side.
     """
-    from skimage.transform import hough_circle, hough_circle_peaks, hough_line, hough_line_peaks
-    from skimage.feature import canny
-    
-    # Edge detection
-    edges = canny(gray, sigma=sigma, low_threshold=0.1, high_threshold=0.3)
-    
-    # Detect circles (gauge face)
-    min_radius = min(height, width) // 8  # Reduced minimum
-    max_radius = min(height, width) // 2
-    
-    if min_radius >= max_radius:
-        return None
-    
-    hough_radii = np.arange(min_radius, max_radius, 5)  # Finer steps
-    hough_res = hough_circle(edges, hough_radii)
-    
-    # Find circles
-    accums, cx_arr, cy_arr, radii = hough_circle_peaks(
-        hough_res, hough_radii, total_num_peaks=3  # Get top 3
-    )
-    
-    if len(cx_arr) == 0:
-        _LOGGER.debug("No circles detected with sigma=%.1f", sigma)
-        return None
-    
-    # Use the strongest circle
-    cx, cy, radius = cy_arr[0], cx_arr[0], radii[0]  # Note: cy/cx swap for row/col
-    _LOGGER.debug("Circle detected at (%d, %d), radius=%d", cx, cy, radius)
-    
-    # Detect lines (needle)
-    tested_angles = np.linspace(-np.pi, np.pi, 720, endpoint=False)
-    h, theta, d = hough_line(edges, theta=tested_angles)
-    
-    # Find lines that pass near the center and calculate their "length" 
-    # (based on how far into the gauge they extend)
-    candidates = []
-    
-    for _, angle, dist in zip(*hough_line_peaks(h, theta, d, num_peaks=30)):
-        # Calculate distance from center to this line
-        dist_from_center = abs(cx * np.cos(angle) + cy * np.sin(angle) - dist)
-        
-        # More lenient threshold (50% of radius)
-        if dist_from_center < radius * 0.5:
-            # Estimate "effective length" based on how close the line is to center
-            # Lines passing through center have higher effective length
-            effective_length = radius - dist_from_center
-            candidates.append({
-                'angle': angle,
-                'dist_from_center': dist_from_center,
-                'effective_length': effective_length
-            })
-    
-    if not candidates:
-        _LOGGER.debug("No needle lines detected near center with sigma=%.1f", sigma)
+    size = _jpeg_size(image_bytes)
+    if size is not None:
+        for factor, flag in (
+            (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+            (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+            (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+        ):
+            if max(size) // factor >= _MAX_IMAGE_SIDE:
+                return flag
+    return cv2.IMREAD_GRAYSCALE
+
+
+def _jpeg_size(data):
+    """Return (width, height) from a JPEG header, or None if not a JPEG."""
+    if data[:2] != b'\xff\xd8':
         return None
     
-    # Log candidates
-    _LOGGER.debug("Found %d line candidates near center", len(candidates))
-    
-    # Select the line with highest effective length (closest to center = longer needle)
-    candidates.sort(key=lambda x: x['effective_length'], reverse=True)
-    best_candidate = candidates[0]
-    
-    _LOGGER.debug("Selected best line: angle=%.2f rad, dist_from_center=%.1f, effective_length=%.1f",
-                  best_candidate['angle'], best_candidate['dist_from_center'], 
-                  best_candidate['effective_length'])
-    
-    return _angle_to_reading(best_candidate['angle'], min_val, max_val)
+    offset = 2
+    while offset + 9 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:  # Fill byte
+            offset += 1
+            continue
+        # SOF0-SOF15 hold the frame size (C4, C8 and CC are other markers)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = int.from_bytes(data[offset + 5:offset + 7], 'big')
+            width = int.from_bytes(data[offset + 7:offset + 9], 'big')
+            return width, height
+        offset += 2 + int.from_bytes(data[offset + 2:offset + 4], 'big')
+    
+    return None
 
 
-def _detect_gauge_threshold(gray, min_val, max_val, height, width):
+def _detect_gauge_threshold(gray8, min_val, max_val, height, width, preferred_direction=None):
     """Detect needle using thresholding - selects the LONGEST needle.
     
     This gauge has two needles:
@@ -147,78 +157,160 @@ def _detect_gauge_threshold(gray, min_val, max_val, height, width):
     We try BOTH threshold directions (darker and lighter than background)
     because in IR images the needle may appear either way.
     We select the LONGEST needle candidate from the best result.
-    """
-    from skimage import filters, morphology, measure
     
+    The IR polarity is stable between frames, so preferred_direction (the
+    direction that won last time) is tried first; the other direction is
+    skipped when it already yields a full-length needle.
+    
+    Returns a (reading, direction) tuple, or (None, None).
+    """
     # Assume gauge is centered and takes up most of the image
     center_x, center_y = width // 2, height // 2
     radius_estimate = min(height, width) // 3
     
     # Apply Otsu thresholding
-    thresh = filters.threshold_otsu(gray)
+    thresh, _ = cv2.threshold(gray8, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
     
-    best_candidates = []
+    # Needle candidates per direction: (direction, lengths, dists, orientations)
+    candidate_sets = []
     
     # Try BOTH directions: needle darker OR lighter than background
     # This is important for IR images where contrast can be inverted
-    for direction in ['darker', 'lighter']:
-        if direction == 'darker':
-            binary = gray < thresh
-        else:
-            binary = gray > thresh
-        
-        # Clean up
-        try:
-            binary = morphology.remove_small_objects(binary, min_size=50)
-        except Exception:
-            pass  # May fail if no objects
-        binary = morphology.closing(binary, morphology.disk(3))
+    if preferred_direction is None:
+        # Polarity unknown yet: run both pipelines in parallel
+        futures = [
+            _DIRECTION_POOL.submit(
+                _find_needle_candidates, gray8, np.empty_like(gray8), thresh, direction,
+                center_x, center_y, radius_estimate,
+            )
+            for direction in ['darker', 'lighter']
+        ]
+        for future in futures:
+            candidates = future.result()
+            if candidates is not None:
+                candidate_sets.append(candidates)
+    else:
+        directions = ['darker', 'lighter']
+        if preferred_direction == 'lighter':
+            directions.reverse()
         
-        # Find connected components
-        labels = measure.label(binary)
-        regions = measure.regionprops(labels)
-        
-        if not regions:
-            continue
-        
-        # Find ALL elongated regions (potential needles)
-        for region in regions:
-            cy, cx = region.centroid
-            dist_to_center = math.sqrt((cx - center_x)**2 + (cy - center_y)**2)
+        # Both directions share one output buffer
+        binary = np.empty_like(gray8)
+        for direction in directions:
+            candidates = _find_needle_candidates(
+                gray8, binary, thresh, direction, center_x, center_y, radius_estimate
+            )
+            if candidates is None:
+                continue
+            candidate_sets.append(candidates)
             
-            # Check if elongated (eccentricity > 0.7 means elongated)
-            if region.eccentricity > 0.7 and region.area > 100:
-                # Only consider regions near the center (within radius)
-                if dist_to_center < radius_estimate:
-                    best_candidates.append({
-                        'region': region,
-                        'length': region.major_axis_length,
-                        'dist_to_center': dist_to_center,
-                        'orientation': region.orientation,
-                        'direction': direction
-                    })
-    
-    if not best_candidates:
+            if direction == preferred_direction and candidates[1].max() > _CONFIDENT_NEEDLE_LENGTH:
+                _LOGGER.debug("Needle found with preferred direction [%s], skipping the other", direction)
+                break
+    
+    if not candidate_sets:
         _LOGGER.debug("No needle candidates found (tried both threshold directions)")
-        return None
+        return None, None
+    
+    candidate_directions = [cand[0] for cand in candidate_sets for _ in cand[1]]
+    lengths = np.concatenate([cand[1] for cand in candidate_sets])
+    dists = np.concatenate([cand[2] for cand in candidate_sets])
+    orientations = np.concatenate([cand[3] for cand in candidate_sets])
     
     # Log all candidates
-    _LOGGER.debug("Found %d needle candidate(s) across both threshold directions:", len(best_candidates))
-    for i, cand in enumerate(best_candidates):
+    _LOGGER.debug("Found %d needle candidate(s):", len(lengths))
+    for i in range(len(lengths)):
         _LOGGER.debug("  Candidate %d [%s]: length=%.1f, dist_to_center=%.1f", 
-                      i+1, cand['direction'], cand['length'], cand['dist_to_center'])
+                      i+1, candidate_directions[i], lengths[i], dists[i])
     
     # Select the LONGEST needle (ignore the short indicator needle)
-    best_candidates.sort(key=lambda x: x['length'], reverse=True)
-    best_candidate = best_candidates[0]
+    best = int(np.argmax(lengths))
+    best_direction = candidate_directions[best]
     
     _LOGGER.info("Selected LONGEST needle [%s]: length=%.1f (ignoring %d shorter needle(s))",
-                 best_candidate['direction'], best_candidate['length'], len(best_candidates) - 1)
+                 best_direction, lengths[best], len(lengths) - 1)
     
     # Get orientation of the selected needle
-    angle = best_candidate['orientation']  # Radians, -pi/2 to pi/2
+    angle = float(orientations[best])  # Radians, -pi/2 to pi/2
+    
+    return _angle_to_reading(angle, min_val, max_val), best_direction
+
+
+def _find_needle_candidates(gray8, binary, thresh, direction, center_x, center_y, radius_estimate):
+    """Find elongated regions near the center for one threshold direction.
+    
+    The thresholded image is written into binary. Returns a
+    (direction, lengths, dists, orientations) tuple, or None if there is
+    no candidate.
+    """
+    if direction == 'darker':
+        cv2.threshold(gray8, thresh, 255, cv2.THRESH_BINARY_INV, binary)
+    else:
+        cv2.threshold(gray8, thresh, 255, cv2.THRESH_BINARY, binary)
+    
+    # Clean up: remove specks first (same as skimage's remove_small_objects,
+    # 4-connected) so the closing cannot join them to the needle
+    _, speck_labels, speck_stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=4)
+    binary[(speck_stats[:, cv2.CC_STAT_AREA] < _MIN_OBJECT_SIZE)[speck_labels]] = 0
+    
+    # Close (in place)
+    cv2.morphologyEx(binary, cv2.MORPH_CLOSE, _CLOSE_KERNEL, binary)
+    
+    # Find connected components (label 0 is the background)
+    _, labels, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
     
-    return _angle_to_reading(angle, min_val, max_val)
+    # Keep sizeable regions near the center (within radius), all at once
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    dists = np.hypot(centroids[1:, 0] - center_x, centroids[1:, 1] - center_y)
+    nearby = np.flatnonzero((areas > _MIN_REGION_AREA) & (dists < radius_estimate)) + 1
+    
+    if nearby.size == 0:
+        return None
+    
+    lengths, eccentricities, orientations = _region_shapes(
+        np.array([_central_moments(labels, stats, label) for label in nearby])
+    )
+    
+    # Find ALL elongated regions
+    elongated = eccentricities > _MIN_ECCENTRICITY
+    if not elongated.any():
+        return None
+    
+    return direction, lengths[elongated], dists[nearby - 1][elongated], orientations[elongated]
+
+
+def _central_moments(labels, stats, label):
+    """Return the normalized central moments (mu20, mu02, mu11) of a label."""
+    x = stats[label, cv2.CC_STAT_LEFT]
+    y = stats[label, cv2.CC_STAT_TOP]
+    w = stats[label, cv2.CC_STAT_WIDTH]
+    h = stats[label, cv2.CC_STAT_HEIGHT]
+    region_mask = (labels[y:y + h, x:x + w] == label).astype(np.uint8)
+    moments = cv2.moments(region_mask, binaryImage=True)
+    m00 = moments['m00']
+    return moments['mu20'] / m00, moments['mu02'] / m00, moments['mu11'] / m00
+
+
+def _region_shapes(central_moments):
+    """Return (major_axis_length, eccentricity, orientation) arrays for regions.
+    
+    Takes an (N, 3) array of normalized central moments (mu20, mu02, mu11)
+    and evaluates all regions at once. Uses the same inertia-ellipse
+    definitions as skimage's regionprops, so the orientation keeps its
+    convention (radians, -pi/2 to pi/2, measured from the row axis).
+    """
+    mu20, mu02, mu11 = central_moments.T
+    
+    # Eigenvalues of the inertia tensor
+    common = np.sqrt(((mu20 - mu02) / 2) ** 2 + mu11 ** 2)
+    l1 = (mu20 + mu02) / 2 + common
+    l2 = (mu20 + mu02) / 2 - common
+    
+    major_axis_length = 4 * np.sqrt(l1)
+    eccentricity = np.sqrt(1 - np.divide(l2, l1, out=np.ones_like(l1), where=l1 > 0))
+    orientation = 0.5 * np.arctan2(2 * mu11, mu02 - mu20)
+    
+    return major_axis_length, eccentricity, orientation
 
 
 def _angle_to_reading(angle_rad, min_val, max_val):
@@ -235,24 +327,20 @@ def _angle_to_reading(angle_rad, min_val, max_val):
     # Hough angle is perpendicular to line direction, adjust
     needle_angle = (angle_deg + 90) % 360
     
-    # Standard gauge parameters
-    gauge_start = 225  # 7 o'clock
-    gauge_sweep = 270  # Total sweep angle
-    
     # Calculate relative position
-    relative_angle = (needle_angle - gauge_start) % 360
+    relative_angle = (needle_angle - _GAUGE_START) % 360
     
     # Clamp to valid range
-    if relative_angle > gauge_sweep:
+    if relative_angle > _GAUGE_SWEEP:
         # Could be on the "wrong side" - try the opposite direction
-        alt_angle = (needle_angle + 180 - gauge_start) % 360
-        if alt_angle <= gauge_sweep:
+        alt_angle = (needle_angle + 180 - _GAUGE_START) % 360
+        if alt_angle <= _GAUGE_SWEEP:
             relative_angle = alt_angle
         else:
-            relative_angle = min(relative_angle, gauge_sweep)
+            relative_angle = min(relative_angle, _GAUGE_SWEEP)
     
     # Calculate reading
-    fraction = relative_angle / gauge_sweep
+    fraction = relative_angle / _GAUGE_SWEEP
     reading = min_val + fraction * (max_val - min_val)
     
     # Clamp to valid range
@@ -5,33 +5,40 @@ import math
 import numpy as np
 from io import BytesIO
 
+try:
+    import cv2
+except ImportError as err:  # Reported when an image is processed
+    cv2 = None
+    _CV2_IMPORT_ERROR = err
+
 logging.basicConfig(level=logging.DEBUG, format='%(name)s - %(levelname)s - %(message)s')
 _LOGGER = logging.getLogger("test_gauge")
 
+# ITU-R BT.601 luma weights scaled to 8 bits (sum 256)
+_LUMA_WEIGHTS = np.array([77, 150, 29], dtype=np.uint16)
+
 def process_gauge_image(image_bytes: bytes, min_val: float, max_val: float) -> float | None:
     """Process gauge image and return the reading."""
     try:
         from skimage import io as skio
-        from skimage import color, filters, morphology, measure
-        from skimage.transform import hough_circle, hough_circle_peaks, hough_line, hough_line_peaks
-        from skimage.feature import canny
     except ImportError as e:
         _LOGGER.error("scikit-image not available: %s", e)
         return None
+    if cv2 is None:
+        _LOGGER.error("OpenCV not available: %s", _CV2_IMPORT_ERROR)
+        return None
 
     try:
         # Load image from bytes
         image = skio.imread(BytesIO(image_bytes))
         _LOGGER.debug("Image loaded, shape: %s", image.shape)
         
-        # Convert to grayscale if needed
+        # Convert to 8-bit grayscale if needed
         if len(image.shape) == 3:
-            # Handle RGBA images (4 channels)
-            if image.shape[2] == 4:
-                image = image[:, :, :3]  # Remove alpha channel
-            gray = color.rgb2gray(image)
+            # BT.601 luma with integer weights in one pass (alpha channel dropped)
+            gray = (image[:, :, :3].astype(np.uint16) @ _LUMA_WEIGHTS >> 8).astype(np.uint8)
         else:
-            gray = image.astype(float) / 255.0 if image.max() > 1 else image
+            gray = image
         
         height, width = gray.shape
         _LOGGER.debug("Grayscale image: %dx%d", width, height)
@@ -53,51 +60,55 @@ def process_gauge_image(image_bytes: bytes, min_val: float, max_val: float) -> f
 
 def _detect_gauge_threshold(gray, min_val, max_val, height, width):
     """Detect needle using thresholding - selects the LONGEST needle."""
-    from skimage import filters, morphology, measure
-    
     # Assume gauge is centered
     center_x, center_y = width // 2, height // 2
     radius_estimate = min(height, width) // 3
     
-    # Apply Otsu thresholding
-    thresh = filters.threshold_otsu(gray)
+    # Apply Otsu thresholding (8-bit)
+    thresh, _ = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
     
     best_candidates = []
     
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
+    
     # Try BOTH directions: needle darker OR lighter than background
+    # (labelled separately: a single "far from threshold" mask fuses the
+    # dark needle with the light dial face)
     for direction in ['darker', 'lighter']:
         if direction == 'darker':
-            binary = gray < thresh
+            binary = (gray < thresh).astype(np.uint8)
         else:
-            binary = gray > thresh
+            binary = (gray > thresh).astype(np.uint8)
         
-        # Clean up
-        try:
-            binary = morphology.remove_small_objects(binary, min_size=50)
-        except Exception:
-            pass
-        binary = morphology.closing(binary, morphology.disk(3))
+        # Clean up: drop specks (like skimage remove_small_objects, 4-connected), then close
+        _, speck_labels, speck_stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=4)
+        binary[(speck_stats[:, cv2.CC_STAT_AREA] < 50)[speck_labels]] = 0
+        binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
         
-        # Find connected components
-        labels = measure.label(binary)
-        regions = measure.regionprops(labels)
+        # Find connected components (label 0 is the background)
+        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
         
-        if not regions:
-            continue
-        
-        for region in regions:
-            cy, cx = region.centroid
-            dist_to_center = math.sqrt((cx - center_x)**2 + (cy - center_y)**2)
+        for label in range(1, num_labels):
+            if stats[label, cv2.CC_STAT_AREA] <= 100:
+                continue
+            
+            cx, cy = centroids[label]
+            dist_to_center = math.hypot(cx - center_x, cy - center_y)
+            if dist_to_center >= radius_estimate:
+                continue
+            
+            # Shape only for the few large regions near the center
+            x, y, w, h = stats[label, :4]
+            region_mask = (labels[y:y + h, x:x + w] == label).astype(np.uint8)
+            length, eccentricity, orientation = _region_shape(cv2.moments(region_mask, binaryImage=True))
             
-            if region.eccentricity > 0.7 and region.area > 100:
-                if dist_to_center < radius_estimate:
-                    best_candidates.append({
-                        'region': region,
-                        'length': region.major_axis_length,
-                        'dist_to_center': dist_to_center,
-                        'orientation': region.orientation,
-                        'direction': direction
-                    })
+            if eccentricity > 0.7:
+                best_candidates.append({
+                    'length': length,
+                    'dist_to_center': dist_to_center,
+                    'orientation': orientation,
+                    'direction': direction
+                })
     
     if not best_candidates:
         _LOGGER.debug("No needle candidates found")
@@ -120,6 +131,22 @@ def _detect_gauge_threshold(gray, min_val, max_val, height, width):
     return _angle_to_reading(angle, min_val, max_val)
 
 
+def _region_shape(moments):
+    """Return (major_axis_length, eccentricity, orientation) like skimage regionprops."""
+    m00 = moments['m00']
+    mu20 = moments['mu20'] / m00
+    mu02 = moments['mu02'] / m00
+    mu11 = moments['mu11'] / m00
+    
+    common = math.sqrt(((mu20 - mu02) / 2) ** 2 + mu11 ** 2)
+    l1 = (mu20 + mu02) / 2 + common
+    l2 = (mu20 + mu02) / 2 - common
+    
+    eccentricity = math.sqrt(1 - l2 / l1) if l1 > 0 else 0.0
+    orientation = 0.5 * math.atan2(2 * mu11, mu02 - mu20)
+    return 4 * math.sqrt(l1), eccentricity, orientation
+
+
 def _angle_to_reading(angle_rad, min_val, max_val):
     """Convert angle to gauge reading."""
     angle_deg = math.degrees(angle_rad)